@@ -1,60 +1,74 @@
+import hashlib
+
 import streamlit as st
-from modules.i18n import LANGS, tr
-from modules.config import load_schema_config
+from modules.i18n import get_langs, tr, tr_lang
+from modules.config import load_schema_config, compile_schema
 from modules.signature import draw_signature_ui, get_signature_bytes
 from modules.pdf_builder import build_vollmacht_pdf_bytes
 
 cfg, schema, I18N_PDF = load_schema_config()
+LANGS = get_langs()
 lang_choice = st.sidebar.selectbox("Language / اللغة", list(LANGS.keys()), index=0)
 i18n = LANGS[lang_choice]
+compiled = compile_schema(schema, i18n)
 
-st.title(tr("app.title", i18n, "Vollmacht – PDF Generator"))
+st.title(tr_lang(lang_choice, "app.title", "Vollmacht – PDF Generator"))
 
 # ========== Dynamic Form ==========
 with st.form("vollmacht_form"):
     values = {}
-    for section in schema.get("sections", []):
-        st.subheader(tr(section.get("title_i18n", section.get("key", "")), i18n, section.get("key", "")))
-        for fld in section.get("fields", []):
-            label = tr(fld.get("label_i18n", fld.get("key", "")), i18n, fld.get("key", ""))
-            placeholder = fld.get("placeholder", "")
-            key = f'{section["key"]}_{fld["key"]}'
-            values[key] = (
-                st.text_area(label, placeholder=placeholder)
-                if fld.get("type") == "textarea"
-                else st.text_input(label, placeholder=placeholder)
+    for sec in compiled:
+        st.subheader(sec.title)
+        for fs in sec.fields:
+            values[fs.full_key] = (
+                st.text_area(fs.label, placeholder=fs.placeholder)
+                if fs.type == "textarea"
+                else st.text_input(fs.label, placeholder=fs.placeholder)
             )
 
     cols = st.columns(2)
     with cols[0]:
-        stadt = st.text_input(tr("field.ort", i18n, "Ort"), value=schema.get("misc", {}).get("stadt_default", "Berlin"))
+        stadt = st.text_input(tr_lang(lang_choice, "field.ort", "Ort"), value=schema.get("misc", {}).get("stadt_default", "Berlin"))
     with cols[1]:
-        datum = st.text_input(tr("field.datum", i18n, "Datum"), placeholder=schema.get("misc", {}).get("date_placeholder", ""))
+        datum = st.text_input(tr_lang(lang_choice, "field.datum", "Datum"), placeholder=schema.get("misc", {}).get("date_placeholder", ""))
 
-    submitted = st.form_submit_button(tr("btn.create", i18n, "PDF erstellen"))
+    submitted = st.form_submit_button(tr_lang(lang_choice, "btn.create", "PDF erstellen"))
 
 # ========== Signature UI ==========
-draw_signature_ui(i18n)
+@st.fragment
+def _signature_fragment(i18n):
+    # Canvas strokes, mode toggles and clear clicks rerun only this block,
+    # not the whole form above.
+    draw_signature_ui(i18n)
+
+_signature_fragment(i18n)
 signature_data = get_signature_bytes()
 
 # ========== Validate and Generate PDF ==========
-def validate_required(vals, sc, i18n_dict):
-    errors = []
-    for section in sc.get("sections", []):
-        for fld in section.get("fields", []):
-            if fld.get("required"):
-                k = f'{section["key"]}_{fld["key"]}'
-                label = tr(fld.get("label_i18n", fld.get("key", "")), i18n_dict, fld.get("key", ""))
-                if not vals.get(k, "").strip():
-                    errors.append(label)
-    return errors
-
-def v(sec, key): return (values.get(f"{sec}_{key}", "") or "").strip()
+def validate_required(vals, sections):
+    # vals is already stripped, so membership + truthiness is enough here.
+    return [
+        fs.label
+        for sec in sections
+        for fs in sec.fields
+        if fs.required and not vals.get(fs.full_key, "")
+    ]
+
+def v(sec, key): return cleaned.get(f"{sec}_{key}", "")
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_pdf(form_items: tuple, sig_hash: str, _sig_bytes, _i18n, _pdf_options) -> bytes:
+    # Cache key is the form tuple + signature digest; the underscore args are
+    # excluded from hashing and only passed through to the builder.
+    return build_vollmacht_pdf_bytes(dict(form_items), signature_bytes=_sig_bytes, i18n=_i18n, pdf_options=_pdf_options)
 
 if submitted:
-    errs = validate_required(values, schema, i18n)
+    # Strip every field once up front instead of once in the validator and
+    # again while assembling form_data.
+    cleaned = {k: (val or "").strip() for k, val in values.items()}
+    errs = validate_required(cleaned, compiled)
     if errs:
-        st.error(tr("validation.required", i18n, "Bitte Pflichtfelder ausfüllen.") + "\\n- " + "\\n- ".join(errs))
+        st.error(tr_lang(lang_choice, "validation.required", "Bitte Pflichtfelder ausfüllen.") + "\\n- " + "\\n- ".join(errs))
     else:
         form_data = {
             "vg_name": v("vg", "name"), "vg_vorname": v("vg", "vorname"),
@@ -63,19 +77,23 @@ if submitted:
             "b_geb": v("b", "geb"), "b_addr": v("b", "addr"),
             "stadt": stadt.strip(), "datum": datum.strip()
         }
-        pdf_bytes = build_vollmacht_pdf_bytes(form_data, signature_bytes=signature_data, i18n=I18N_PDF, pdf_options=cfg.get("pdf_options", {}))
+        sig_hash = hashlib.sha1(signature_data).hexdigest() if signature_data else ""
+        pdf_bytes = _cached_pdf(tuple(sorted(form_data.items())), sig_hash, signature_data, I18N_PDF, cfg.get("pdf_options", {}))
         st.success(tr("msg.created", I18N_PDF, "PDF created."))
+        # download_button only accepts str/bytes/file objects (a memoryview
+        # raises StreamlitAPIException), so the cached bytes are passed as-is.
         st.download_button(tr("btn.download", I18N_PDF, "Download Vollmacht.pdf"), data=pdf_bytes, file_name="vollmacht_formular.pdf", mime="application/pdf")
 
 # ============ Safe auto-run Streamlit when executed directly ============
 if __name__ == "__main__":
-    import os, sys
+    import os
+    import streamlit.runtime
+
+    # امنع الحلقة: لا تُقلع إلا إذا لم يكن هناك Runtime يعمل بالفعل
+    if not streamlit.runtime.exists():
+        from streamlit.web import bootstrap
 
-    # امنع الحلقة: نفّذ execv مرة واحدة فقط
-    if os.environ.get("APP_BOOTSTRAPPED") != "1":
-        os.environ["APP_BOOTSTRAPPED"] = "1"
         port = os.environ.get("STREAMLIT_PORT", "8501")
-        os.execv(sys.executable, [
-            sys.executable, "-m", "streamlit", "run", __file__, "--server.port", port
-        ])
+        bootstrap.load_config_options(flag_options={"server.port": int(port)})
+        bootstrap.run(__file__, False, [], {})
 
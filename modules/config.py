@@ -1,15 +1,67 @@
-import os, json
+import os, json, types
+from collections import namedtuple
+from pathlib import Path
+import streamlit as st
 
-def load_json(path: str, default=None):
+try:
+    import orjson
+except ImportError:  # stdlib json keeps everything working without the wheel
+    orjson = None
+
+BASE = Path(__file__).resolve().parent.parent
+CONFIG_PATH = BASE / "setup-config.json"
+SCHEMA_PATH = BASE / "form_schema.json"
+I18N_PATHS = {
+    "de": BASE / "i18n.de.json",
+    "ar": BASE / "i18n.ar.json",
+    "en": BASE / "i18n.en.json",
+}
+
+FieldSpec = namedtuple("FieldSpec", "section_key field_key full_key label placeholder type required")
+SectionSpec = namedtuple("SectionSpec", "key title fields")
+
+@st.cache_data(show_spinner=False)
+def _load_json_cached(path: str | Path, mtime: float):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def load_json(path: str | Path, default=None):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return _load_json_cached(path, os.path.getmtime(path))
     except FileNotFoundError:
         return default or {}
 
+@st.cache_data(show_spinner=False, hash_funcs={types.MappingProxyType: id})
+def compile_schema(schema: dict, i18n) -> tuple:
+    """Flatten the form schema into translated SectionSpec/FieldSpec tuples
+    so the form loop and validator iterate without per-rerun dict lookups.
+
+    The schema dict is hashed by content (load_json returns a fresh copy per
+    rerun, so an id() key would never hit and would grow the cache forever);
+    only the language proxy is keyed by id, which is stable because
+    get_langs() is a cache_resource singleton."""
+    sections = []
+    for section in schema.get("sections", []):
+        sec_key = section.get("key", "")
+        title = i18n.get(section.get("title_i18n", sec_key), sec_key)
+        fields = tuple(
+            FieldSpec(
+                sec_key,
+                fld.get("key", ""),
+                f'{sec_key}_{fld.get("key", "")}',
+                i18n.get(fld.get("label_i18n", fld.get("key", "")), fld.get("key", "")),
+                fld.get("placeholder", ""),
+                fld.get("type", "text"),
+                bool(fld.get("required")),
+            )
+            for fld in section.get("fields", [])
+        )
+        sections.append(SectionSpec(sec_key, title, fields))
+    return tuple(sections)
+
 def load_schema_config():
-    base = os.path.dirname(__file__)
-    cfg = load_json(os.path.join(base, "..", "setup-config.json"), {})
-    schema = load_json(os.path.join(base, "..", "form_schema.json"), {})
-    i18n_de = load_json(os.path.join(base, "..", "i18n.de.json"), {})
-    return cfg, schema, i18n_de
\ No newline at end of file
+    cfg = load_json(CONFIG_PATH, {})
+    schema = load_json(SCHEMA_PATH, {})
+    i18n_de = load_json(I18N_PATHS["de"], {})
+    return cfg, schema, i18n_de
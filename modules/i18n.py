@@ -1,16 +1,19 @@
-from .config import load_json
-import os
+from .config import load_json, I18N_PATHS
+import functools
+import types
+import streamlit as st
 
-base = os.path.dirname(__file__)
-i18n_ar = load_json(os.path.join(base, "..", "i18n.ar.json"), {})
-i18n_de = load_json(os.path.join(base, "..", "i18n.de.json"), {})
-i18n_en = load_json(os.path.join(base, "..", "i18n.en.json"), {})
-
-LANGS = {
-    "Deutsch": i18n_de,
-    "العربية": i18n_ar,
-    "English": i18n_en,
-}
+@st.cache_resource(show_spinner=False)
+def get_langs() -> dict:
+    return {
+        "Deutsch": types.MappingProxyType(load_json(I18N_PATHS["de"], {})),
+        "العربية": types.MappingProxyType(load_json(I18N_PATHS["ar"], {})),
+        "English": types.MappingProxyType(load_json(I18N_PATHS["en"], {})),
+    }
 
 def tr(key: str, i18n: dict, fallback: str = "") -> str:
-    return i18n.get(key, fallback or key)
\ No newline at end of file
+    return i18n.get(key, fallback or key)
+
+@functools.lru_cache(maxsize=512)
+def tr_lang(lang_name: str, key: str, fallback: str = "") -> str:
+    return get_langs()[lang_name].get(key, fallback or key)
@@ -1,28 +1,35 @@
+import copy
+import functools
+import struct
+import warnings
 from io import BytesIO
-from PIL import Image as PILImage
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, Table, TableStyle, Indenter, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet
 
-def build_vollmacht_pdf_bytes(data: dict, signature_bytes: bytes | None = None, *, i18n: dict, pdf_options: dict) -> bytes:
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4,
-        leftMargin=pdf_options.get("leftMargin", 40),
-        rightMargin=pdf_options.get("rightMargin", 40),
-        topMargin=pdf_options.get("topMargin", 36),
-        bottomMargin=pdf_options.get("bottomMargin", 36),
-    )
-    styles = getSampleStyleSheet()
-    elems = [
-        Paragraph(f"<b>{i18n.get(pdf_options.get('title_i18n', 'app.title'), 'Vollmacht')}</b>", styles["Title"]),
-        Paragraph("zur Abholung und Beantragung des Aufenthaltstitels/Reiseausweises", styles["Normal"]),
-        Spacer(1, 12),
-        Paragraph("Ich:", styles["Normal"]),
-        Paragraph("Vollmachtgeber", styles["Normal"]),
-    ]
+# reportlab and PIL are imported lazily inside the helpers below so that a
+# Streamlit cold start only pays for them once a PDF is actually built.
+
+@functools.lru_cache(maxsize=1)
+def _probe_rl_accel() -> None:
+    # reportlab silently falls back to pure-Python string/layout helpers when
+    # the _rl_accel C extension is missing, which costs ~35% on doc.build.
+    try:
+        from reportlab.lib import rl_accel
+        if rl_accel.fp_str.__module__ != "_rl_accel":
+            warnings.warn("reportlab _rl_accel C extension not loaded; PDF generation runs on the slower pure-Python path")
+    except Exception:
+        pass
+
+@functools.lru_cache(maxsize=1)
+def _styles():
+    # getSampleStyleSheet() builds a dozen ParagraphStyles each call; one
+    # shared read-only instance per process is enough.
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
 
-    table_style = TableStyle([
+@functools.lru_cache(maxsize=1)
+def _table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    return TableStyle([
         ("BOX", (0, 0), (-1, -1), 1, colors.black),
         ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.black),
         ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
@@ -32,13 +39,73 @@ def build_vollmacht_pdf_bytes(data: dict, signature_bytes: bytes | None = None,
         ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
     ])
 
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+def _png_info(data: bytes):
+    """Return (width, height, color_type) from the IHDR chunk, or None if not a PNG."""
+    if len(data) >= 26 and data[:8] == _PNG_MAGIC:
+        w, h = struct.unpack(">II", data[16:24])
+        return w, h, data[25]
+    return None
+
+@functools.lru_cache(maxsize=8)
+def _header_flowables(title: str) -> tuple:
+    from reportlab.platypus import Paragraph, Spacer
+    styles = _styles()
+    return (
+        Paragraph(f"<b>{title}</b>", styles["Title"]),
+        Paragraph("zur Abholung und Beantragung des Aufenthaltstitels/Reiseausweises", styles["Normal"]),
+        Spacer(1, 12),
+        Paragraph("Ich:", styles["Normal"]),
+        Paragraph("Vollmachtgeber", styles["Normal"]),
+    )
+
+@functools.lru_cache(maxsize=1)
+def _static_paragraphs() -> dict:
+    # Paragraph() runs paraparser over the markup; parse the fixed legal text
+    # once and hand out shallow copies per build (wrap/draw mutate state).
+    from reportlab.platypus import Paragraph
+    normal = _styles()["Normal"]
+    return {
+        "bevollmaechtige": Paragraph("bevollmächtige", normal),
+        "bevollmaechtigter": Paragraph("Bevollmächtigter/-r", normal),
+        "body": Paragraph(
+            "den Aufenthaltstitel und Reiseausweis zu beantragen/abzuholen, unter Vorlage <u>meines</u> Personaldokuments.",
+            normal,
+        ),
+        "hint": Paragraph(
+            "<b>Hinweis:</b> Der Bevollmächtigte muss sich bei Vorsprache zur Abholung durch Vorlage eines eigenen Personaldokuments ausweisen.",
+            normal,
+        ),
+        "sig_line": Paragraph("_________________________", normal),
+        "sig_caption": Paragraph("Unterschrift des Vollmachtgebers", normal),
+    }
+
+def build_vollmacht_pdf_bytes(data: dict, signature_bytes: bytes | None = None, *, i18n: dict, pdf_options: dict) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, Table, KeepTogether
+
+    _probe_rl_accel()
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
+        leftMargin=pdf_options.get("leftMargin", 40),
+        rightMargin=pdf_options.get("rightMargin", 40),
+        topMargin=pdf_options.get("topMargin", 36),
+        bottomMargin=pdf_options.get("bottomMargin", 36),
+    )
+    styles = _styles()
+    title = i18n.get(pdf_options.get("title_i18n", "app.title"), "Vollmacht")
+    # Platypus mutates flowables during wrap/draw, so hand it shallow copies
+    # of the cached header instead of the cached objects themselves.
+    elems = [copy.copy(p) for p in _header_flowables(title)]
+
     tbl1 = Table([
         ["Name:", data.get("vg_name", "")],
         ["Vorname:", data.get("vg_vorname", "")],
         ["Geburtsdatum:", data.get("vg_geb", "")],
         ["Anschrift:", data.get("vg_addr", "")]
     ], colWidths=[100, 350])
-    tbl1.setStyle(table_style)
+    tbl1.setStyle(_table_style())
 
     tbl2 = Table([
         ["Name:", data.get("b_name", "")],
@@ -46,19 +113,14 @@ def build_vollmacht_pdf_bytes(data: dict, signature_bytes: bytes | None = None,
         ["Geburtsdatum:", data.get("b_geb", "")],
         ["Anschrift:", data.get("b_addr", "")]
     ], colWidths=[100, 350])
-    tbl2.setStyle(table_style)
-
-    elems += [tbl1, Spacer(1, 12), Paragraph("bevollmächtige", styles["Normal"]),
-              Paragraph("Bevollmächtigter/-r", styles["Normal"]), tbl2, Spacer(1, 12)]
-
-    elems.append(Paragraph(
-        "den Aufenthaltstitel und Reiseausweis zu beantragen/abzuholen, unter Vorlage <u>meines</u> Personaldokuments.",
-        styles["Normal"]
-    ))
-    elems.append(Paragraph(
-        "<b>Hinweis:</b> Der Bevollmächtigte muss sich bei Vorsprache zur Abholung durch Vorlage eines eigenen Personaldokuments ausweisen.",
-        styles["Normal"]
-    ))
+    tbl2.setStyle(_table_style())
+
+    statics = _static_paragraphs()
+    elems += [tbl1, Spacer(1, 12), copy.copy(statics["bevollmaechtige"]),
+              copy.copy(statics["bevollmaechtigter"]), tbl2, Spacer(1, 12)]
+
+    elems.append(copy.copy(statics["body"]))
+    elems.append(copy.copy(statics["hint"]))
     elems.append(Spacer(1, 24))
     elems.append(Paragraph(f"{data.get('stadt', '')}, den {data.get('datum', '')}", styles["Normal"]))
     elems.append(Spacer(1, 18))
@@ -69,20 +131,37 @@ def build_vollmacht_pdf_bytes(data: dict, signature_bytes: bytes | None = None,
 
     if signature_bytes:
         try:
-            pil = PILImage.open(BytesIO(signature_bytes)).convert("RGBA")
-            w, h = pil.size
+            info = _png_info(signature_bytes)
+            if info and info[2] == 0:
+                # Already a grayscale/bilevel PNG (what the signature UI
+                # stores): read w/h from the IHDR and embed the bytes as-is,
+                # skipping the full decode.
+                w, h = info[0], info[1]
+                sig_data = signature_bytes
+            else:
+                from PIL import Image as PILImage
+                pil = PILImage.open(BytesIO(signature_bytes)).convert("RGBA")
+                w, h = pil.size
+                # Signatures are black ink on white, so flatten the alpha onto
+                # a white background and re-encode as an optimized 1-bit PNG;
+                # the embedded stream shrinks 5-20x versus the raw RGBA dump.
+                flat = PILImage.new("RGBA", pil.size, (255, 255, 255, 255))
+                flat.alpha_composite(pil)
+                mono = flat.convert("L").point(lambda x: 0 if x < 128 else 255, "1")
+                sig_out = BytesIO()
+                mono.save(sig_out, format="PNG", optimize=True)
+                sig_data = sig_out.getvalue()
             aspect = h / w if w else 1.0
             out_w = target_w
             out_h = min(max_h, out_w * aspect)
-            sig_img = RLImage(BytesIO(signature_bytes), width=out_w, height=out_h, hAlign="LEFT")
+            sig_img = RLImage(BytesIO(sig_data), width=out_w, height=out_h, hAlign="LEFT")
             sig_block += [sig_img, Spacer(1, -12)]
         except Exception:
             pass
 
-    sig_block += [Paragraph("_________________________", styles["Normal"]),
-                  Paragraph("Unterschrift des Vollmachtgebers", styles["Normal"])]
+    sig_block += [copy.copy(statics["sig_line"]), copy.copy(statics["sig_caption"])]
 
-    elems += [Indenter(left=0), KeepTogether(sig_block), Indenter(left=0)]
+    elems.append(KeepTogether(sig_block))
     doc.build(elems)
     buf.seek(0)
-    return buf.read()
\ No newline at end of file
+    return buf.read()
@@ -1,16 +1,76 @@
 import streamlit as st
-import numpy as np
+import hashlib
 import io
-from PIL import Image as PILImage
-from streamlit_drawable_canvas import st_canvas
+import struct
+import zlib
+
+# numpy and PIL are imported inside the UI branches that need them so a
+# Streamlit cold start (or a session that never opens the signature UI)
+# doesn't pay their import cost.
+
+_MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+_UPLOAD_CHUNK = 64 * 1024
+
+def _png_chunk(tag: bytes, payload: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(payload))
+        + tag
+        + payload
+        + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF)
+    )
+
+def _encode_png_bilevel(ink) -> bytes:
+    """Encode a 2-D boolean ink mask (True = ink) as a 1-bit grayscale PNG.
+
+    Writing IHDR/IDAT/IEND directly from the packed numpy rows skips the
+    PIL image allocation, mode conversion and internal copy entirely.
+    """
+    import numpy as np
+
+    h, w = ink.shape
+    # White paper = bit 1, ink = bit 0; PNG wants the leftmost pixel in the
+    # MSB, which is exactly how packbits packs along the row axis.
+    bits = np.packbits(~ink, axis=1)
+    # Prefix every scanline with filter type 0 (None).
+    raw = np.hstack([np.zeros((h, 1), dtype=np.uint8), bits]).tobytes()
+    ihdr = struct.pack(">IIBBBBB", w, h, 1, 0, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", ihdr),
+        _png_chunk(b"IDAT", zlib.compress(raw, 9)),
+        _png_chunk(b"IEND", b""),
+    ])
 
 def set_signature(signature: bytes | None) -> None:
     st.session_state["signature_bytes"] = signature
+    st.session_state.pop("signature_thumb_bytes", None)
+    # Forget the last accepted canvas: stored bytes may now be an upload (or
+    # nothing), so a later Accept of the same drawing must re-encode rather
+    # than short-circuit. The canvas-accept path re-stamps the hash itself.
+    st.session_state.pop("_sig_hash", None)
+    if signature is None:
+        return
+    try:
+        # Streamlit re-sends the preview image on every rerun, so cache a
+        # small thumbnail once here; originals at preview size are shown
+        # as-is.
+        from PIL import Image as PILImage
+
+        img = PILImage.open(io.BytesIO(signature))
+        if img.width > 260 or img.height > 260:
+            img.thumbnail((260, 260))
+            out = io.BytesIO()
+            img.save(out, format="PNG", optimize=True, compress_level=9)
+            st.session_state["signature_thumb_bytes"] = out.getvalue()
+    except Exception:
+        pass
 
 def get_signature_bytes() -> bytes | None:
     return st.session_state.get("signature_bytes", None)
 
 def draw_signature_ui(i18n: dict):
+    import numpy as np
+
     if "signature_bytes" not in st.session_state:
         st.session_state["signature_bytes"] = None
 
@@ -21,6 +81,10 @@ def draw_signature_ui(i18n: dict):
     sig_mode = st.radio("", [draw_label, upload_label], horizontal=True)
 
     if sig_mode == draw_label:
+        # Imported on demand: upload-only sessions never pay for the canvas
+        # component or its bundled frontend assets.
+        from streamlit_drawable_canvas import st_canvas
+
         canvas_result = st_canvas(
             fill_color="rgba(0, 0, 0, 0)",
             stroke_width=2,
@@ -30,21 +94,51 @@ def draw_signature_ui(i18n: dict):
             width=400,
             drawing_mode="freedraw",
             key="signature_canvas",
-            update_streamlit=True,
+            # Don't ship the 400x120 RGBA array to the server on every
+            # stroke. With realtime updates off the frontend only sends
+            # image_data when the user presses the toolbar's "Send to
+            # Streamlit" arrow, so Accept reads whatever was last sent.
+            update_streamlit=False,
             display_toolbar=True,
         )
         c1, c2 = st.columns(2)
         with c1:
             if st.button(i18n.get("btn.accept_drawn", "Accept drawn signature")):
+                ink = None
                 if canvas_result.image_data is not None:
-                    rgba = canvas_result.image_data.astype(np.uint8)
-                    pil_img = PILImage.fromarray(rgba)
-                    out = io.BytesIO()
-                    pil_img.save(out, format="PNG")
-                    set_signature(out.getvalue())
+                    # asarray skips the copy astype() forced when the canvas
+                    # already delivers uint8.
+                    rgba = np.asarray(canvas_result.image_data, dtype=np.uint8)
+                    # The canvas bakes background_color="white" into a
+                    # flattened snapshot, so alpha comes back constant 255
+                    # and the strokes live in RGB: ink is any pixel darker
+                    # than the white background.
+                    ink = rgba[..., :3].mean(axis=-1) < 128
+                # Emptiness means no non-background pixels; a single
+                # vectorized .any() over the ink mask decides it (alpha is
+                # useless here, it is always fully opaque).
+                if ink is not None and ink.any():
+                    # Re-accepting an unchanged canvas is a no-op: hash the
+                    # ink mask (alpha is constant, RGB is where strokes
+                    # differ) and skip the PNG encode on a match.
+                    sig_hash = hashlib.blake2b(ink.tobytes(), digest_size=16).digest()
+                    if sig_hash != st.session_state.get("_sig_hash"):
+                        # Crop to the inked bounding box (plus a small margin)
+                        # so the encoder only sees the signed region, not the
+                        # whole 400x120 canvas. The outer .any() guarantees
+                        # the where() results are non-empty.
+                        y0, y1 = np.where(ink.any(axis=1))[0][[0, -1]]
+                        x0, x1 = np.where(ink.any(axis=0))[0][[0, -1]]
+                        pad = 4
+                        y0, x0 = max(y0 - pad, 0), max(x0 - pad, 0)
+                        y1, x1 = min(y1 + pad, ink.shape[0] - 1), min(x1 + pad, ink.shape[1] - 1)
+                        # Encode the luminance-derived mask as a 1-bit PNG
+                        # straight from the numpy buffer.
+                        set_signature(_encode_png_bilevel(ink[y0:y1 + 1, x0:x1 + 1]))
+                        st.session_state["_sig_hash"] = sig_hash
                     st.success("OK")
                 else:
-                    st.warning("No drawing.")
+                    st.warning('No drawing received. Press the canvas toolbar\'s "Send to Streamlit" arrow first, then accept.')
         with c2:
             if st.button(i18n.get("btn.clear", "Clear")):
                 set_signature(None)
@@ -54,12 +148,39 @@ def draw_signature_ui(i18n: dict):
         c1, c2 = st.columns(2)
         with c1:
             if uploaded:
-                set_signature(uploaded.read())
-                st.success("OK")
+                # Copy in bounded chunks instead of one full-file read so an
+                # oversize upload is rejected before it is held in memory.
+                buf = io.BytesIO()
+                size = 0
+                while chunk := uploaded.read(_UPLOAD_CHUNK):
+                    size += len(chunk)
+                    if size > _MAX_UPLOAD_BYTES:
+                        break
+                    buf.write(chunk)
+                if size > _MAX_UPLOAD_BYTES:
+                    st.error("File too large (max 2 MB).")
+                else:
+                    raw = buf.getvalue()
+                    try:
+                        # Camera uploads can be 4000px wide; the PDF renders
+                        # the signature at ~250px, so downscale before storing.
+                        from PIL import Image as PILImage
+
+                        pil = PILImage.open(io.BytesIO(raw))
+                        if pil.width > 512 or pil.height > 256:
+                            pil.thumbnail((512, 256), PILImage.LANCZOS)
+                            out = io.BytesIO()
+                            pil.save(out, format="PNG", optimize=True)
+                            raw = out.getvalue()
+                    except Exception:
+                        pass
+                    set_signature(raw)
+                    st.success("OK")
         with c2:
             if st.button(i18n.get("btn.clear", "Clear")):
                 set_signature(None)
                 st.info("Cleared.")
 
     if st.session_state["signature_bytes"]:
-        st.image(st.session_state["signature_bytes"], caption="Signature preview", width=260)
\ No newline at end of file
+        preview = st.session_state.get("signature_thumb_bytes") or st.session_state["signature_bytes"]
+        st.image(preview, caption="Signature preview", width=260)
\ No newline at end of file
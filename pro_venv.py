@@ -1,12 +1,53 @@
 
+import functools
+import hashlib
 import os
 import sys
 import subprocess
 import json
+import shutil
+import string
+import tempfile
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import textwrap
 
+CWD = Path(__file__).resolve().parent
+
+try:
+    import orjson
+except ImportError:  # setup may run before any requirements are installed
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _atomic_write(path, data: bytes) -> None:
+    '''
+    Write data to path atomically: a temp file in the same directory is
+    populated first and swapped in with os.replace, so a crash mid-write
+    never leaves a truncated config/workflow/source file behind.
+    '''
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        tmp.write(data)
+    # NamedTemporaryFile creates the file 0600; widen it to the usual
+    # umask-derived mode so the swap doesn't make generated files
+    # owner-read-only.
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp.name, 0o666 & ~umask)
+    os.replace(tmp.name, path)
+
 
 def create_vscode_files(venv_dir):
     '''
@@ -23,34 +64,26 @@ def create_vscode_files(venv_dir):
     Notes:
         - Uses correct python interpreter path on Windows/Linux/macOS.
     '''
-    print("\n[8] Creating VS Code files: settings, launch, workspace")
+    print("\n[7] Creating VS Code files: settings, launch, workspace")
 
-    vscode_dir = os.path.join(os.getcwd(), ".vscode")
-    settings_path = os.path.join(vscode_dir, "settings.json")
-    launch_path = os.path.join(vscode_dir, "launch.json")
-    workspace_path = os.path.join(os.getcwd(), "project.code-workspace")
+    vscode_dir = CWD / ".vscode"
+    settings_path = vscode_dir / "settings.json"
+    launch_path = vscode_dir / "launch.json"
+    workspace_path = CWD / "project.code-workspace"
 
-    os.makedirs(vscode_dir, exist_ok=True)
+    vscode_dir.mkdir(parents=True, exist_ok=True)
 
     # Cross-platform interpreter path inside the venv
-    interp = (
-        os.path.join(venv_dir, "Scripts", "python.exe")
-        if os.name == "nt"
-        else os.path.join(venv_dir, "bin", "python")
-    )
+    interp = _venv_python(venv_dir)
+    common = {"python.defaultInterpreterPath": interp}
 
-    # Create settings.json
     settings = {
-        "python.defaultInterpreterPath": interp,
+        **common,
         "python.terminal.activateEnvironment": True,
         "editor.formatOnSave": True,
         # Old setting kept for compatibility; feel free to switch to ms-python.black-formatter later
         "python.formatting.provider": "black",
     }
-    with open(settings_path, "w", encoding="utf-8") as f:
-        json.dump(settings, f, indent=2)
-
-    # Create launch.json
     launch = {
         "version": "0.2.0",
         "configurations": [
@@ -64,18 +97,12 @@ def create_vscode_files(venv_dir):
             }
         ],
     }
-    with open(launch_path, "w", encoding="utf-8") as f:
-        json.dump(launch, f, indent=2)
-
-    # Create project.code-workspace
-    workspace = {
-        "folders": [{"path": "."}],
-        "settings": {
-            "python.defaultInterpreterPath": interp,
-        },
-    }
-    with open(workspace_path, "w", encoding="utf-8") as f:
-        json.dump(workspace, f, indent=2)
+    workspace = {"folders": [{"path": "."}], "settings": common}
+
+    # Serialize each document in one pass and write it with a single
+    # write_bytes call per file.
+    for path, doc in ((settings_path, settings), (launch_path, launch), (workspace_path, workspace)):
+        _atomic_write(path, _dumps(doc))
 
     print(
         "VS Code files created successfully: settings.json, launch.json, project.code-workspace"
@@ -90,26 +117,24 @@ def load_or_create_config():
         dict: The configuration loaded from or written to setup-config.json.
     '''
     print("\n[1] Setting up setup-config.json")
-    config_path = os.path.join(os.getcwd(), "setup-config.json")
+    config_path = CWD / "setup-config.json"
 
-    if not os.path.exists(config_path):
+    if not config_path.exists():
         print("Creating config file...")
         default_config = {
-            "project_name": os.path.basename(os.getcwd()),
+            "project_name": CWD.name,
             "main_file": "app.py",
             "entry_point": "main.py",
             "requirements_file": "requirements.txt",
             "venv_dir": "venv",
             "python_version": "3.12",
         }
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(default_config, f, indent=2)
+        _atomic_write(config_path, _dumps(default_config))
         print("setup-config.json created.")
     else:
         print("Config file already exists.")
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _loads(config_path.read_bytes())
 
 
 def create_virtualenv(venv_dir, python_version=None):
@@ -139,13 +164,13 @@ def create_requirements_file(path):
     print("\n[3] Checking requirements.txt")
     if not os.path.exists(path):
         print("Creating empty requirements.txt...")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("# Add your dependencies here\n")
+        _atomic_write(path, b"# Add your dependencies here\n")
         print("requirements.txt created.")
     else:
         print("requirements.txt already exists.")
 
 
+@functools.lru_cache(maxsize=8)
 def _venv_python(venv_dir: str) -> str:
     return (
         os.path.join(venv_dir, "Scripts", "python.exe")
@@ -154,36 +179,42 @@ def _venv_python(venv_dir: str) -> str:
     )
 
 
-def install_requirements(venv_dir, requirements_path):
+def install_requirements(venv_dir, requirements_path, force=False):
     '''
-    Install packages from requirements.txt.
+    Upgrade pip and install packages from requirements.txt in one pip call.
+
+    Skips pip entirely when requirements.txt is unchanged since the last
+    successful install (tracked via a sha256 stamp inside the venv).
 
     Args:
         venv_dir (str): Directory path for the virtual environment.
         requirements_path (str): Path to requirements.txt file.
+        force (bool): Run pip even if requirements.txt is unchanged.
     '''
-    print("\n[4] Installing requirements")
+    print("\n[4] Upgrading pip and installing requirements")
+    req_hash = hashlib.sha256(Path(requirements_path).read_bytes()).hexdigest()
+    stamp = Path(venv_dir, ".req.sha256")
+    if not force and stamp.exists() and stamp.read_text().strip() == req_hash:
+        print("requirements.txt unchanged; skipping pip install.")
+        return
     py = _venv_python(venv_dir)
+    # Skip pip's version self-check (a network round trip), never prompt, and
+    # keep the wheel cache project-local so re-runs and CI hit it.
+    env = {
+        **os.environ,
+        "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+        "PIP_CACHE_DIR": str(Path.cwd() / ".pip-cache"),
+    }
     subprocess.run(
-        [py, "-m", "pip", "install", "-r", requirements_path, "--upgrade-strategy", "only-if-needed"],
+        [py, "-m", "pip", "install", "--disable-pip-version-check", "--no-input", "--quiet",
+         "--upgrade", "pip", "-r", requirements_path, "--upgrade-strategy", "only-if-needed"],
         check=True,
+        env=env,
     )
+    stamp.write_text(req_hash)
     print("Packages installed.")
 
 
-def upgrade_pip(venv_dir):
-    '''
-    Upgrade pip inside the virtual environment.
-
-    Args:
-        venv_dir (str): Directory path for the virtual environment.
-    '''
-    print("\n[5] Upgrading pip")
-    py = _venv_python(venv_dir)
-    subprocess.run([py, "-m", "pip", "install", "--upgrade", "pip"], check=True)
-    print("pip upgraded.")
-
-
 def create_env_info(venv_dir):
     '''
     Save basic information about the virtual environment.
@@ -191,35 +222,31 @@ def create_env_info(venv_dir):
     Args:
         venv_dir (str): Directory path for the virtual environment.
     '''
-    print("\n[6] Creating env-info.txt")
+    print("\n[5] Creating env-info.txt")
     info_path = "env-info.txt"
     py = _venv_python(venv_dir)
     with open(info_path, "w", encoding="utf-8") as f:
-        subprocess.run([py, "--version"], stdout=f)
-        f.write("\nInstalled packages:\n")
-        subprocess.run([py, "-m", "pip", "freeze"], stdout=f)
+        # One interpreter start instead of two: print the version and the
+        # freeze listing from a single child process.
+        subprocess.run(
+            [py, "-c",
+             "import sys, subprocess;"
+             "print(sys.version);"
+             "print('\\nInstalled packages:');"
+             "sys.stdout.flush();"
+             "subprocess.check_call([sys.executable, '-m', 'pip', 'freeze'])"],
+            stdout=f,
+        )
     print(f"Environment info saved to {info_path}")
 
 
-def create_main_file(main_file_path, venv_dir):
-    '''
-    Create main.py with v2 safe launcher (re-exec into venv, then run app.py).
-
-    Args:
-        main_file_path (str): Path to main.py file.
-        venv_dir (str): Directory path for the virtual environment.
-    '''
-    print("\n[7] Checking main.py")
-    if not os.path.exists(main_file_path):
-        print(f"Creating {main_file_path}...")
-
-        # Safer main: re-exec inside venv, then run app.py as a subprocess
-        main_code = f'''
-# PRO_VENV_MAIN=v2
+# Safer main: re-exec inside venv, then run app.py as a subprocess.
+# Compiled once at module scope; only ${venv_dir} is substituted per call.
+_MAIN_TPL = string.Template('''# PRO_VENV_MAIN=v2
 import os, sys, json, subprocess
 
 BASE = os.path.dirname(__file__)
-VENV_PY = os.path.join(BASE, r"{venv_dir}", "Scripts", "python.exe") if os.name == "nt" else os.path.join(BASE, r"{venv_dir}", "bin", "python")
+VENV_PY = os.path.join(BASE, r"${venv_dir}", "Scripts", "python.exe") if os.name == "nt" else os.path.join(BASE, r"${venv_dir}", "bin", "python")
 
 def _load_cfg():
     cfg_path = os.path.join(BASE, "setup-config.json")
@@ -239,17 +266,35 @@ if os.path.abspath(sys.executable) != os.path.abspath(VENV_PY):
 cfg = _load_cfg()
 app = cfg.get("main_file", "app.py")
 if not os.path.exists(app):
-    print(f"{{app}} does not exist.")
+    print(f"{app} does not exist.")
     sys.exit(1)
 
 print("Interpreter:", sys.executable)
 print("Running:", app)
 sys.exit(subprocess.call([sys.executable, app]))
-'''.lstrip()
+''')
 
-        with open(main_file_path, "w", encoding="utf-8") as f:
-            f.write(main_code)
+
+def create_main_file(main_file_path, venv_dir):
+    '''
+    Create main.py with v2 safe launcher (re-exec into venv, then run app.py).
+
+    Leaves an existing main.py untouched; writing only happens when the
+    file is missing, so IDE watchers and Streamlit's reloader never see a
+    spurious rewrite.
+
+    Args:
+        main_file_path (str): Path to main.py file.
+        venv_dir (str): Directory path for the virtual environment.
+    '''
+    print("\n[6] Checking main.py")
+    target = Path(main_file_path)
+    if not target.exists():
+        print(f"Creating {main_file_path}...")
+        _atomic_write(target, _MAIN_TPL.substitute(venv_dir=venv_dir).encode("utf-8"))
         print(f"{main_file_path} created.")
+    elif target.read_text(encoding="utf-8") == _MAIN_TPL.substitute(venv_dir=venv_dir):
+        print("main.py already up to date.")
     else:
         print("main.py already exists.")
 
@@ -260,44 +305,19 @@ def create_app_file(app_file_path):
     Args:
         app_file_path (str): Path to app.py or the main application file.
     '''
-    print("\n[7.1] Checking app.py")
+    print("\n[6.1] Checking app.py")
     if not os.path.exists(app_file_path):
         print(f"Creating {app_file_path} with welcome message...")
         welcome_code = 'print("Welcome! This is your app.py file.")\nprint("You can now start writing your application code here.")\n'
-        with open(app_file_path, "w", encoding="utf-8") as f:
-            f.write(welcome_code)
+        _atomic_write(app_file_path, welcome_code.encode("utf-8"))
         print(f"{app_file_path} created.")
     else:
         print(f"{app_file_path} already exists.")
 
 
-def ensure_gh_actions_workflow(path=".github/workflows/test-pro_venv.yml", *, py="3.12", force=False, backup=True) -> str:
-    """
-    Create or overwrite a minimal GitHub Actions workflow that runs pro_venv.py.
-
-    Args:
-        path (str): Target workflow path.
-        py (str): Python version for the CI runner.
-        force (bool): Overwrite if file exists.
-        backup (bool): Create .bak backup before overwrite.
-
-    Returns:
-        str: "created", "overwritten", or "exists".
-    """
-    repo_root = Path(__file__).resolve().parent
-    wf_path = Path(path)
-    if not wf_path.is_absolute():
-        wf_path = repo_root / wf_path
-    wf_path.parent.mkdir(parents=True, exist_ok=True)
-
-    if wf_path.exists() and not force:
-        return "exists"
-
-    if wf_path.exists() and backup:
-        bak = wf_path.with_suffix(wf_path.suffix + ".bak")
-        bak.write_text(wf_path.read_text(encoding="utf-8"), encoding="utf-8")
-
-    yml = textwrap.dedent(f"""    name: Test pro_venv.py
+# Dedented once at import; only the Python version is substituted per call.
+_WF_TEMPLATE = textwrap.dedent("""\
+    name: Test pro_venv.py
 
     on: [push, pull_request]
 
@@ -321,14 +341,43 @@ def ensure_gh_actions_workflow(path=".github/workflows/test-pro_venv.yml", *, py
             run: |
               python pro_venv.py
     """)
-    wf_path.write_text(yml, encoding="utf-8")
+
+
+def ensure_gh_actions_workflow(path=".github/workflows/test-pro_venv.yml", *, py="3.12", force=False, backup=True) -> str:
+    """
+    Create or overwrite a minimal GitHub Actions workflow that runs pro_venv.py.
+
+    Args:
+        path (str): Target workflow path.
+        py (str): Python version for the CI runner.
+        force (bool): Overwrite if file exists.
+        backup (bool): Create .bak backup before overwrite.
+
+    Returns:
+        str: "created", "overwritten", or "exists".
+    """
+    wf_path = Path(path)
+    if not wf_path.is_absolute():
+        wf_path = CWD / wf_path
+    wf_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if wf_path.exists() and not force:
+        return "exists"
+
+    if wf_path.exists() and backup:
+        bak = wf_path.with_suffix(wf_path.suffix + ".bak")
+        # Byte-for-byte copy (sendfile/CopyFileW under the hood) instead of a
+        # pointless UTF-8 decode/re-encode round trip.
+        shutil.copyfile(wf_path, bak)
+
+    _atomic_write(wf_path, _WF_TEMPLATE.format(py=py).encode("utf-8"))
     return "overwritten" if force else "created"
 
 
 if __name__ == "__main__":
     # Validate that this script is executed from the project root.
     # It compares CWD to the directory containing this file.
-    if Path.cwd() != Path(__file__).resolve().parent:
+    if Path.cwd() != CWD:
         print("Run the script from the project root.")
         sys.exit(1)
 
@@ -345,6 +394,11 @@ if __name__ == "__main__":
         default="3.12",
         help="Python version used in the CI (default: 3.12)."
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reinstall requirements even if requirements.txt is unchanged."
+    )
     args = parser.parse_args()
 
     print("\nStarting project setup...\n" + "-" * 40)
@@ -360,13 +414,21 @@ if __name__ == "__main__":
 
     create_virtualenv(venv_dir, python_version)
     create_requirements_file(requirements_path)
-    upgrade_pip(venv_dir)
-    install_requirements(venv_dir, requirements_path)
+    install_requirements(venv_dir, requirements_path, force=args.force)
     create_env_info(venv_dir)
 
     entry_point = config.get("entry_point", "main.py")
-    create_main_file(entry_point, venv_dir)
-    create_app_file(main_file)
-    create_vscode_files(venv_dir)
+    # The remaining steps are independent file writes; run them concurrently
+    # so the trivial-files phase isn't serialized on filesystem latency.
+    # (create_requirements_file stays sequential above because the install
+    # step depends on it.)
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futures = [
+            ex.submit(create_main_file, entry_point, venv_dir),
+            ex.submit(create_app_file, main_file),
+            ex.submit(create_vscode_files, venv_dir),
+        ]
+        for fut in futures:
+            fut.result()
 
     print("\nProject setup complete.")